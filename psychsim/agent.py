@@ -4,6 +4,7 @@ import inspect
 import logging
 import multiprocessing
 import os
+import sys
 try:
     from cStringIO import StringIO
 except ImportError:
@@ -304,10 +305,35 @@ class Agent(object):
                            for action in actions]
                 V = {action: result.get() for action, result in results}
         elif rationality != 0:
-            # Compute values in sequence
+            # Compute values in sequence, reusing any computed by previous decisions from the same beliefs
+            cache = self.world.value_cache
+            signature = self.value_signature(belief, model, horizon, others, keySet, debug)
+            # When only the best actions matter, the others can be abandoned once their lookahead falls behind
+            if strict_max and self.getAttribute('prune', model):
+                reward_bounds = self.getReward(model).bounds(makeFuture(rewardKey(self.name)))
+            else:
+                reward_bounds = None
+            best_EV = None
             V = {}
             for action in actions:
-                V[action] = self.value(belief, action, model, horizon, others, keySet, debug=debug, context=context)
+                key = None if signature is None else signature+(action,)
+                if key in cache:
+                    cache.move_to_end(key)
+                    V[action] = cache[key]
+                else:
+                    V[action] = self.value(belief, action, model, horizon, others, keySet, debug=debug, context=context,
+                                           bound=None if reward_bounds is None else best_EV, reward_bounds=reward_bounds)
+                    if V[action].get('__pruned__', False):
+                        # Its value is only partial, and it cannot be chosen anyway
+                        logging.debug('{} V_{}^{}({}) pruned'.format(context, model, horizon, action))
+                        del V[action]
+                        continue
+                    elif key is not None:
+                        cache[key] = V[action]
+                        if len(cache) > self.world.value_cache_size:
+                            cache.popitem(last=False)
+                if best_EV is None or V[action]['__EV__'] > best_EV:
+                    best_EV = V[action]['__EV__']
                 logging.debug('{} V_{}^{}({})={}'.format(context, model, horizon, action, V[action]['__EV__']))
         if rationality == 0:
             # Uniform value function over all actions
@@ -318,7 +344,10 @@ class Agent(object):
             best = None
             for action in actions:
                 # Determine whether this action is the best
-                if best is None:
+                if action not in V:
+                    # Pruned
+                    continue
+                elif best is None:
                     best = [action]
                 elif V[action]['__EV__'] == V[best[0]]['__EV__']:
                     best.append(action)
@@ -335,7 +364,8 @@ class Agent(object):
                 result['action'] = min(best)
             else:
                 prob = 1/float(len(best))
-                result['action'] = Distribution({action: prob for action in best})
+                # Sorted, so that sampling does not depend on the (hash-based) order of the actions
+                result['action'] = Distribution({action: prob for action in sorted(best)})
         else:
             values = {key: entry['__EV__'] for key, entry in V.items()}
             result['action'] = Distribution(values, self.getAttribute('rationality', model))
@@ -346,8 +376,32 @@ class Agent(object):
         logging.debug('{} Choosing {}'.format(context, result['action']))
         return result
 
+    def value_signature(self, belief, model, horizon, others=None, keySet=None, debug={}):
+        """
+        :returns: a key identifying the values computed by L{value} for the given decision parameters within the world's value cache, or ``None`` if these values should not be cached
+        :rtype: tuple
+        """
+        if self.world.value_cache_size <= 0 or keySet is not None or debug:
+            return None
+        elif not isinstance(belief, VectorDistributionSet) or self.getAttribute('samples', model) is not None:
+            return None
+        if others:
+            if not all(isinstance(choice, ActionSet) for choice in others.values()):
+                # Policies of other agents are not worth comparing
+                return None
+            others = frozenset(others.items())
+        else:
+            others = None
+        return self.name, model, horizon, others, belief.signature()
+
     def value(self, belief, action, model=None, horizon=None, others=None, 
-              keySet=None, updateBeliefs=True, samples=None, debug={}, context=''):
+              keySet=None, updateBeliefs=True, samples=None, debug={}, context='', bound=None, reward_bounds=None):
+        """
+        :param bound: if provided, the lookahead stops (marking the result as ``__pruned__``) as soon as the reward function's upper bound shows that the expected value cannot reach this bound
+        :type bound: float
+        :param reward_bounds: the lowest and highest reward under this model, as returned by L{KeyedTree.bounds} (default is to compute them from the reward function when a bound is given)
+        :type reward_bounds: (float, float)
+        """
         if model is None:
             model = self.get_true_model(unique=True)
         if horizon is None:
@@ -389,14 +443,26 @@ class Agent(object):
                     node['__prob__'] = 1
                 else:
                     node['__prob__'] = node['__S__'][0].select()
+            optimism = None
+            if bound is not None and samples is None:
+                if reward_bounds is None:
+                    reward_bounds = self.getReward(model).bounds(makeFuture(rewardKey(self.name)))
+                discount = self.getAttribute('discount', model)
+                if reward_bounds is not None and discount >= 0:
+                    # Most that the remaining lookahead can add to the expected value after each step
+                    optimism = [sum([max(reward_bounds[1], 0)*discount**t for t in range(step, horizon)])
+                                for step in range(horizon+1)]
             V = {'__nodes__': []}
             while nodes:
                 index = 0
                 while index < len(nodes):
                     s = nodes[index]['__S__'][-1]
-                    if nodes[index]['__t__'] < horizon and not self.world.terminated(nodes[index]['__S__'][-1]):
+                    if nodes[index]['__t__'] < horizon and not nodes[index].get('__pruned__', False) and \
+                            not self.world.terminated(nodes[index]['__S__'][-1]):
                         nodes[index] = self.expand_value(nodes[index], nodes[index]['__start__'], model, subkeys, horizon, 
                                                          updateBeliefs, samples is not None, debug, context)
+                        if optimism is not None and nodes[index]['__EV__'] + optimism[nodes[index]['__t__']] < bound:
+                            nodes[index]['__pruned__'] = True
                         index += 1
                     else:
                         nodes[index]['__beliefs__'] = nodes[index]['__S__'][-1]
@@ -575,6 +641,9 @@ class Agent(object):
                 self.setAttribute(name,value,model['name'])
         else:
             self.models[model][name] = value
+            if name != 'R tree' and self.world is not None:
+                # The summed reward tree is derived, so only the other attributes can change any values
+                self.world.clear_value_cache()
 
     def findAttribute(self,name,model):
         """
@@ -664,6 +733,7 @@ class Agent(object):
             self.world.defineVariable(key, ActionSet,description='Action performed by %s' % (self.name))
             self.world.setFeature(key, new)
         self.world.dynamics[new] = {}
+        self.world.clear_value_cache()
         return new
 
     def getActions(self,vector=None,actions=None):
@@ -705,6 +775,7 @@ class Agent(object):
         :type tree: L{KeyedTree}
         """
         self.legal[action] = tree.desymbolize(self.world.symbols)
+        self.world.clear_value_cache()
 
     def hasAction(self, atom):
         """
@@ -776,6 +847,7 @@ class Agent(object):
                                           description='Reward for %s in this state' % (self.name))
                 self.world.setFeature(key, 0)
             self.setAttribute('R tree', None)
+            self.world.clear_value_cache()
 
     def getReward(self, model=None):
         if model is None:
@@ -899,6 +971,7 @@ class Agent(object):
          - rationality: the rationality parameter used in a quantal response function when modeling others (default is 10),float
          - discount: discount factor used in lookahead
          - selection: selection mechanism used in L{decide}
+         - prune: if ``True``, L{decide} abandons the lookahead of any action that can no longer match the best value found so far (only when selecting among the maximum-value actions), leaving such actions out of the values it returns
          - parent: another model that this model inherits from (default is ``True``)
 
         :param name: the label for this model
@@ -911,6 +984,9 @@ class Agent(object):
             raise NameError('"None" is an illegal model name')
         if name in self.models:
             return self.models[name]
+        if isinstance(name, str):
+            # Model names are compared over and over within distributions over models
+            name = sys.intern(name)
 #        if name in self.world.symbols:
 #            raise NameError('Model %s conflicts with existing symbol' % (name))
         model = {'name': name,'index': 0,'parent': None,'SE': {}, 'transition': {}, 'ignore': []}
@@ -1038,6 +1114,7 @@ class Agent(object):
         """
         del self.modelList[self.models[name]['index']]
         del self.models[name]
+        self.world.clear_value_cache()
 
     def predict(self,vector,name,V,horizon=0):
         """
@@ -1223,6 +1300,7 @@ class Agent(object):
         if modelKey(self.name) in beliefs:
             self.world.setFeature(modelKey(self.name),model,beliefs)
         self.models[model]['beliefs'] = beliefs
+        self.world.clear_value_cache()
         return beliefs
 
     def set_fully_observable(self):
@@ -1238,6 +1316,7 @@ class Agent(object):
                       if not isModelKey(var) and not isRewardKey(var) 
                       and var not in unobservable]
         self.omega.append(modelKey(self.name))
+        self.world.clear_value_cache()
 
     def setBelief(self, key, distribution, model=None, state=None):
         self.set_belief(key, distribution, model, state)
@@ -1262,6 +1341,7 @@ class Agent(object):
         if beliefs is True:
             beliefs = self.create_belief_state(state, model)
         self.world.set_feature(key, distribution, beliefs)
+        self.world.clear_value_cache()
 
     def getBelief(self, vector=None, model=None):
         return self.get_belief(vector, model)
@@ -1,8 +1,12 @@
 import logging
+import multiprocessing
+import random
+from enum import IntEnum
+import numpy as np
 from psychsim.agent import Agent
-from psychsim.helper_functions import multi_compare_row, set_constant_reward, get_true_model_name
+from psychsim.helper_functions import get_true_model_name
 from psychsim.probability import Distribution
-from psychsim.pwl import makeTree, equalRow, setToConstantMatrix
+from psychsim.pwl import makeTree, matrixLookupTree, setToConstantMatrix, setToMatrixLookup, rewardKey
 from psychsim.world import World
 
 __author__ = 'Pedro Sequeira'
@@ -28,11 +32,15 @@ __description__ = 'Example of using theory-of-mind in a game-theory scenario inv
 MAX_HORIZON = 4
 NUM_STEPS = 4
 TIEBREAK = 'random'  # when values of decisions are the same, choose randomly
+SEED = 0  # each horizon is simulated with its own random seed, offset from this one
+
+
+# action indexes (values of the agents' decision features)
+class Dec(IntEnum):
+    NOT_DECIDED = 0
+    DEFECTED = 1
+    COOPERATED = 2
 
-# action indexes
-NOT_DECIDED = 0
-DEFECTED = 1
-COOPERATED = 2
 
 # payoff parameters (according to PD)
 SUCKER = -3  # CD
@@ -41,42 +49,52 @@ MUTUAL_COOP = -1  # CC
 PUNISHMENT = -2  # DD
 INVALID = -10000
 
+# payoff of my decision (row) given the other's decision (column), both indexed by Dec, invalid if I did not decide
+# (int16 rather than int8, which cannot hold INVALID)
+PAYOFF = np.array([[INVALID, INVALID, INVALID],
+                   [PUNISHMENT, PUNISHMENT, TEMPTATION],
+                   [SUCKER, SUCKER, MUTUAL_COOP]], dtype=np.int16)
+
+# legal actions given my decision (row) and the other's decision (column), as bits indexed by action (see LEGAL_BIT)
+# (inspired on tit-for-tat: first decision is open, then retaliate non-cooperation)
+LEGAL = np.array([[0b11, 0b01, 0b10],
+                  [0b01, 0b01, 0b01],
+                  [0b11, 0b01, 0b10]], dtype=np.uint8)
+LEGAL_BIT = {'defect': 0, 'cooperate': 1}
+
 DEBUG = False
 
 
 # defines a payoff matrix tree (0 = didn't decide, 1 = Defected, 2 = Cooperated)
 def get_reward_tree(agent, my_dec, other_dec):
-    return makeTree({'if': multi_compare_row({my_dec: 1}, NOT_DECIDED),  # if dec >= 0
-                     True: {'if': multi_compare_row({my_dec: -1}, NOT_DECIDED),  # if dec <= 0, did not yet decide
-                            True: set_constant_reward(agent, INVALID),
-                            False: {'if': equalRow(my_dec, COOPERATED),  # if dec >=2, I cooperated
-                                    True: {'if': equalRow(other_dec, COOPERATED),  # if other cooperated
-                                           True: set_constant_reward(agent, MUTUAL_COOP),  # both cooperated
-                                           False: set_constant_reward(agent, SUCKER)},
-                                    False: {'if': equalRow(other_dec, COOPERATED),
-                                            # if I defected and other cooperated
-                                            True: set_constant_reward(agent, TEMPTATION),
-                                            False: set_constant_reward(agent, PUNISHMENT)}}},  # both defected
-                     False: set_constant_reward(agent, INVALID)})  # invalid
+    return setToMatrixLookup(rewardKey(agent.name), my_dec, other_dec, PAYOFF)
+
+
+# defines the legality tree of the given action, shared lookup on both decisions
+def get_legal_tree(action, my_dec, other_dec):
+    bit = LEGAL_BIT[action]
+    return matrixLookupTree(my_dec, other_dec, [[bool((mask >> bit) & 1) for mask in row] for row in LEGAL])
 
 
 def get_state_desc(world, dec_feature):
     decision = world.getValue(dec_feature)
-    if decision == NOT_DECIDED:
+    if decision == Dec.NOT_DECIDED:
         return 'N/A'
-    if decision == DEFECTED:
+    if decision == Dec.DEFECTED:
         return 'defected'
-    if decision == COOPERATED:
+    if decision == Dec.COOPERATED:
         return 'cooperated'
 
 
-if __name__ == '__main__':
-
-    # sets up log to screen
-    logging.basicConfig(format='%(message)s', level=logging.DEBUG if DEBUG else logging.INFO)
-
+def build_world():
+    """
+    Creates the two-agent game with undecided agents
+    :return: the world, its agents, and their decision features
+    :rtype: (World, list[Agent], list[str])
+    """
     # create world and add agent
     world = World()
+    world.set_value_cache()
     agent1 = Agent('Agent 1')
     world.addAgent(agent1)
     agent2 = Agent('Agent 2')
@@ -88,11 +106,12 @@ if __name__ == '__main__':
         # set agent's params
         agent.setAttribute('discount', 1)
         agent.setAttribute('selection', TIEBREAK)
+        agent.setAttribute('prune', True)
 #        agent.setRecursiveLevel(1)
 
         # add "decision" variable (0 = didn't decide, 1 = Defected, 2 = Cooperated)
         dec = world.defineState(agent.name, 'decision', int, lo=0, hi=2)
-        world.setFeature(dec, NOT_DECIDED)
+        world.setFeature(dec, int(Dec.NOT_DECIDED))
         agents_dec.append(dec)
 
     # define agents' actions inspired on tit-for-tat: first decision is open, then retaliate non-cooperation.
@@ -102,23 +121,13 @@ if __name__ == '__main__':
         other_dec = agents_dec[0 if i == 1 else 1]
 
         # defect (not legal if other has cooperated before, legal only if agent itself did not defect before)
-        action = agent.addAction({'verb': '', 'action': 'defect'},
-                                 makeTree({'if': equalRow(other_dec, COOPERATED),
-                                           True: {'if': equalRow(my_dec, DEFECTED),
-                                                  True: True,
-                                                  False: False},
-                                           False: True}))
-        tree = makeTree(setToConstantMatrix(my_dec, DEFECTED))
+        action = agent.addAction({'verb': '', 'action': 'defect'}, get_legal_tree('defect', my_dec, other_dec))
+        tree = makeTree(setToConstantMatrix(my_dec, int(Dec.DEFECTED)))
         world.setDynamics(my_dec, action, tree)
 
         # cooperate (not legal if other or agent itself defected before)
-        action = agent.addAction({'verb': '', 'action': 'cooperate'},
-                                 makeTree({'if': equalRow(other_dec, DEFECTED),
-                                           True: False,
-                                           False: {'if': equalRow(my_dec, DEFECTED),
-                                                   True: False,
-                                                   False: True}}))
-        tree = makeTree(setToConstantMatrix(my_dec, COOPERATED))
+        action = agent.addAction({'verb': '', 'action': 'cooperate'}, get_legal_tree('cooperate', my_dec, other_dec))
+        tree = makeTree(setToConstantMatrix(my_dec, int(Dec.COOPERATED)))
         world.setDynamics(my_dec, action, tree)
 
     # defines payoff matrices (equal to both agents)
@@ -133,31 +142,62 @@ if __name__ == '__main__':
     world.setMentalModel(agent1.name, agent2.name, Distribution({get_true_model_name(agent2): 1}))
     world.setMentalModel(agent2.name, agent1.name, Distribution({get_true_model_name(agent1): 1}))
 
+    return world, agents, agents_dec
+
+
+def run_horizon(horizon):
+    """
+    Simulates NUM_STEPS rounds of the game, in a newly built world, from undecided agents planning with the given horizon
+    :return: the description of each agent's decision after each step
+    :rtype: list[dict[str, str]]
+    """
+    random.seed(SEED + horizon)
+    world, agents, agents_dec = build_world()
+
+    # set horizon (also to the true model!)
+    for agent in agents:
+        agent.setHorizon(horizon)
+        agent.setHorizon(horizon, get_true_model_name(agent))
+
+    trajectory = []
+    for t in range(NUM_STEPS):
+        # decision per step (1 per agent): cooperate or defect?
+        step = world.step()
+        trajectory.append({agent.name: get_state_desc(world, dec) for agent, dec in zip(agents, agents_dec)})
+
+        # print('________________________________')
+        # world.explain(step, level=2) # todo step does not provide outcomes anymore
+
+        # print('\n') #todo step does not provide outcomes anymore
+        # for i in range(len(agents)):
+        #     decision_infos = get_decision_info(step, agents[i].name)
+        #     explain_decisions(agents[i].name, decision_infos)
+    return trajectory
+
+
+def init_logging():
+    """
+    Sets up log to screen (also in worker processes, which do not inherit it under the spawn start method)
+    """
+    logging.basicConfig(format='%(message)s', level=logging.DEBUG if DEBUG else logging.INFO)
+
+
+if __name__ == '__main__':
+
+    init_logging()
+
+    # the horizons are independent of each other, so simulate them in parallel
+    with multiprocessing.Pool(initializer=init_logging) as pool:
+        trajectories = pool.map(run_horizon, range(MAX_HORIZON + 1))
+
     # save log
 
-    for h in range(MAX_HORIZON + 1):
+    for h, trajectory in enumerate(trajectories):
         logging.info('====================================')
         logging.info('Horizon {}'.format(h))
 
-        # set horizon (also to the true model!) and reset decisions
-        for i in range(len(agents)):
-            agents[i].setHorizon(h)
-            agents[i].setHorizon(h, get_true_model_name(agents[i]))
-            world.setFeature(agents_dec[i], NOT_DECIDED)
-
-        for t in range(NUM_STEPS):
-
-            # decision per step (1 per agent): cooperate or defect?
+        for t, decisions in enumerate(trajectory):
             logging.info('---------------------')
             logging.info('Step {}'.format(t))
-            step = world.step()
-            for i in range(len(agents)):
-                logging.info('{0}: {1}'.format(agents[i].name, get_state_desc(world, agents_dec[i])))
-
-            # print('________________________________')
-            # world.explain(step, level=2) # todo step does not provide outcomes anymore
-
-            # print('\n') #todo step does not provide outcomes anymore
-            # for i in range(len(agents)):
-            #     decision_infos = get_decision_info(step, agents[i].name)
-            #     explain_decisions(agents[i].name, decision_infos)
+            for name, decision in decisions.items():
+                logging.info('{0}: {1}'.format(name, decision))
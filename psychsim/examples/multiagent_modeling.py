@@ -1,5 +1,6 @@
 import random
 import time
+import numpy as np
 
 from psychsim.agent import Agent
 from psychsim.probability import Distribution
@@ -35,6 +36,7 @@ if __name__ == '__main__':
 
     # create world and add actor agent
     world = World()
+    world.set_value_cache()
 
     # for each agent
     team = []
@@ -44,7 +46,7 @@ if __name__ == '__main__':
         agent.setAttribute('selection', AGENT_SELECTION)
 
         # add location variable
-        loc = world.defineState(agent.name, 'location', int, -1000, 1000, 'Agent\'s location')
+        loc = world.defineState(agent.name, 'location', int, -1000, 1000, description='Agent\'s location')
         world.setFeature(loc, 0)
 
         # define agents' actions (left and right)
@@ -93,8 +95,9 @@ if __name__ == '__main__':
 
             # set uniform belief over agent's model in actor1
             model_names = [name for name in agent.models.keys() if name != true_model]
-            dist = Distribution({model: 1. / (len(agent.models) - 1) for model in model_names})
-            world.setMentalModel(learner_agent.name, agent.name, dist)
+            model_ids = np.array([agent.model2index(name) for name in model_names], dtype=np.int32)
+            world.setMentalModel(learner_agent.name, agent.name,
+                                 (model_ids, np.full(len(model_ids), 1. / len(model_ids))))
 
             for model in model_names:
                 # make models less rational to get smoother (more cautious) inference
@@ -113,15 +116,17 @@ if __name__ == '__main__':
         print(f'Initial {agent.name} loc: {world.getFeature(loc)}')
         print(f'Initial belief about {agent.name}\'s model:\n{_get_belief(agent_model, learner_agent)}')
 
+    # the learner's model (and thus its belief state) changes with every step, but the keys of interest do not
+    modeled_agent = team[1]
+    agent_model = modelKey(modeled_agent.name)
+    loc = stateKey(modeled_agent.name, 'location')
+
     start_time = time.time()
     for i in range(MAX_STEPS):
         print('====================================')
         print('Step:', i)
         step = world.step(select=False, horizon=HORIZON, tiebreak='distribution')
-        for agent in [team[1]]:
-            agent_model = modelKey(agent.name)
-            loc = stateKey(agent.name, 'location')
-            print(f'Current {agent.name} loc: {world.getFeature(loc)}')
-            print(f'Updated belief about {agent.name}\'s model:\n{_get_belief(agent_model, learner_agent)}')
+        print(f'Current {modeled_agent.name} loc: {world.getFeature(loc)}')
+        print(f'Updated belief about {modeled_agent.name}\'s model:\n{_get_belief(agent_model, learner_agent)}')
         print(f'Time spent: {time.time()-start_time: .2f}s')
         start_time = time.time()
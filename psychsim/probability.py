@@ -36,6 +36,21 @@ class Distribution:
         else:
             self.__items = []
 
+    @classmethod
+    def from_array(cls, elements, probabilities):
+        """
+        :param elements: the elements of the domain
+        :param probabilities: the probability of each element, in the same order (e.g., a NumPy array)
+        :returns: the distribution pairing each element with its probability (summed over any repeats of an element)
+        :rtype: L{Distribution}
+        """
+        if len(elements) != len(probabilities):
+            raise ValueError(f'{len(elements)} elements, but {len(probabilities)} probabilities')
+        merged = {}
+        for element, prob in zip(elements, probabilities):
+            merged[element] = merged.get(element, 0.) + float(prob)
+        return cls(merged)
+
     def first(self):
         """
         :returns: the first element in this distribution's domain (most useful if there's only one element)
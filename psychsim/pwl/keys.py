@@ -1,4 +1,7 @@
 
+from functools import lru_cache
+import sys
+
 # Special keys
 CONSTANT = ''
 VALUE = '__VALUE__'
@@ -8,20 +11,21 @@ REWARD = '__REWARD__'
 MODEL = '__MODEL__'
 TURN = '__TURN__'
 
+@lru_cache(maxsize=None)
 def stateKey(name,feature,future=False):
     """
     :param future: if C{True}, then this refers to the projected value of this feature (default is C{False})
     :type future: bool
-    :returns: a key representation of a given entity's state feature
+    :returns: a key representation of a given entity's state feature (interned, and memoized, as the same keys are requested over and over)
     :rtype: str
     """
     assert isinstance(future,bool),'Future flag is non-boolean: %s' % (future)
     if future:
-        return stateKey(name,feature)+"'"
+        return sys.intern(stateKey(name,feature)+"'")
     elif name is None:
         return feature
     else:
-        return '%s\'s %s' % (name,feature)
+        return sys.intern('%s\'s %s' % (name,feature))
 TERMINATED = stateKey(WORLD,'__END__')
 
 def isStateKey(key):
@@ -107,6 +111,7 @@ def actionKey(name,future=False):
 def isActionKey(key):
     return isStateKey(key) and state2feature(key) == ACTION
 
+@lru_cache(maxsize=None)
 def modelKey(name,future=False):
     return stateKey(name,MODEL,future)
 
@@ -141,6 +146,7 @@ def likesKey(subj,obj):
 def isLikesKey(key):
     return ' likes -- ' in key
 
+@lru_cache(maxsize=None)
 def rewardKey(name,future=False):
     return stateKey(name,REWARD,future)
 
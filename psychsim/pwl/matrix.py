@@ -375,7 +375,10 @@ def setToFeatureMatrix(key, otherKey, pct=1, shift=0):
     :returns: a dynamics matrix setting the given keyed value to a percentage of another keyed value plus a constant shift (default is 100% with shift of 0)
     :rtype: L{KeyedMatrix}
     """
-    return KeyedMatrix({makeFuture(key): KeyedVector({otherKey: pct,CONSTANT: shift})})
+    row = KeyedVector({otherKey: pct})
+    if shift != 0:
+        row[CONSTANT] = shift
+    return KeyedMatrix({makeFuture(key): row})
 
 
 def addFeatureMatrix(key, otherKey, pct=1):
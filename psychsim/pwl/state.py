@@ -971,6 +971,16 @@ class VectorDistributionSet:
                     remaining -= set(distributionMe.keys())
             return True
 
+    def signature(self):
+        """
+        :returns: a hashable summary of this state, where equal states have equal signatures
+        :rtype: tuple
+        """
+        certain = frozenset((key, self.certain[key]) for key, substate in self.keyMap.items() if substate is None)
+        uncertain = frozenset(frozenset((frozenset(vector.items()), prob) for vector, prob in self.distributions[substate].items())
+                              for substate in set(self.keyMap.values()) if substate is not None)
+        return certain, uncertain
+
     def delete_value(self, key, value):
         """Removes the given value for the given key from the state and then renormalizes
         :param value: value (or set of values) to be removed
@@ -125,13 +125,22 @@ class KeyedTree:
                 self.makeProbabilistic(distribution)
             
     def __getitem__(self,index):
-        if self.isLeaf():
-            return self.children[None]
-        elif self.branch is None:
+        node = self
+        while not node.isLeaf() and node.branch is not None:
+            # Deterministic branch (walked in a loop, rather than recursively, as this is the common case)
+            subindex = node.branch.evaluate(index)
+            try:
+                node = node.children[subindex]
+            except KeyError:
+                logging.error('Missing child for case %s in tree:\n%s' % (subindex,node))
+                raise ValueError('Missing child for case %s in tree' % (subindex))
+        if node.isLeaf():
+            return node.children[None]
+        else:
             # Probabilistic branch
             result = {}
-            for element in self.children.domain():
-                prob = self.children[element]
+            for element in node.children.domain():
+                prob = node.children[element]
                 subtree = element[index]
                 if isinstance(subtree,Distribution):
                     for subelement in subtree.domain():
@@ -145,15 +154,6 @@ class KeyedTree:
                     except KeyError:
                         result[subtree] = prob
             return Distribution(result)
-        else:
-            # Deterministic branch
-            subindex = self.branch.evaluate(index)
-            try:
-                child = self.children[subindex]
-            except KeyError:
-                logging.error('Missing child for case %s in tree:\n%s' % (subindex,self))
-                raise ValueError('Missing child for case %s in tree' % (subindex))
-            return child[index]
 
     def desymbolize(self, table, debug=False):
         """
@@ -679,6 +679,22 @@ class KeyedTree:
         else:
             return sum([child.leaves() for child in self.children.values()],[])
 
+    def bounds(self, key):
+        """
+        :returns: the lowest and highest values that the leaves of this tree assign to the given key, or ``None`` if any leaf's value depends on the state (or does not assign the key at all)
+        :rtype: (float, float)
+        """
+        values = set()
+        for leaf in self.leaves():
+            try:
+                row = leaf[key]
+            except (KeyError, TypeError):
+                return None
+            if set(row.keys()) != {CONSTANT}:
+                return None
+            values.add(row[CONSTANT])
+        return min(values), max(values)
+
     def __hash__(self):
         return hash(tuple(self.children.items()))
 #        return hash(str(self))
@@ -853,6 +869,31 @@ def makeTree(table, normalize=True):
         return KeyedTree(table)
 
 
+def matrixLookupTree(row_key, col_key, table):
+    """
+    :param table: the leaves to look up, indexed by the (integer) values of the row and column features
+    :returns: a tree selecting the table entry indexed by the given features, using a single branch on the combined index rather than a branch per feature
+    :rtype: L{KeyedTree}
+    """
+    num_cols = len(table[0])
+    tree = {'if': equalRow({row_key: num_cols, col_key: 1}, list(range(len(table)*num_cols)))}
+    for row, values in enumerate(table):
+        for col, value in enumerate(values):
+            tree[row*num_cols+col] = value
+    return makeTree(tree)
+
+
+def setToMatrixLookup(key, row_key, col_key, table):
+    """
+    :param table: the values to look up, indexed by the (integer) values of the row and column features
+    :type table: float[][]
+    :returns: a tree setting the given keyed value to the table entry indexed by the given features
+    :rtype: L{KeyedTree}
+    """
+    return matrixLookupTree(row_key, col_key, [[setToConstantMatrix(key, float(value)) for value in values]
+                                               for values in table])
+
+
 def collapseDynamics(tree, effects, variables={}):
     effects.reverse()
     present = tree.getKeysIn()
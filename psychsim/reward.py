@@ -27,9 +27,10 @@ def achieveFeatureValue(key, value, agent):
 
 
 def achieve_feature_value(key, value, agent):
+    R = rewardKey(agent)
     return makeTree({'if': equalRow(key, value),
-                     True: setToConstantMatrix(rewardKey(agent), 1),
-                     False: setToConstantMatrix(rewardKey(agent), 0)})
+                     True: setToConstantMatrix(R, 1),
+                     False: setToConstantMatrix(R, 0)})
 
 
 def achieveGoal(key, agent, invert=False):
@@ -41,15 +42,20 @@ def achieve_goal(key, agent, invert=False):
     :param invert: if C{True}, then reward is gained if the feature is False, 
                    not True (as is the default)
     """
+    R = rewardKey(agent)
     return makeTree({'if': falseRow(key) if invert else trueRow(key),
-                     True: setToConstantMatrix(rewardKey(agent), 1),
-                     False: setToConstantMatrix(rewardKey(agent), 0)})
+                     True: setToConstantMatrix(R, 1),
+                     False: setToConstantMatrix(R, 0)})
 
 
 def minimizeDifference(key1, key2, agent):
+    """
+    :return: a reward function equal to -|key1-key2|, which (being piecewise linear) needs the one comparison to pick the sign
+    """
+    R = rewardKey(agent)
     return makeTree({'if': greaterThanRow(key1, key2),
-                     True: dynamicsMatrix(rewardKey(agent), {key1: -1, key2: 1}),
-                     False: dynamicsMatrix(rewardKey(agent), {key1: 1, key2: -1})})
+                     True: dynamicsMatrix(R, {key1: -1, key2: 1}),
+                     False: dynamicsMatrix(R, {key1: 1, key2: -1})})
 
 
 def null_reward(agent):
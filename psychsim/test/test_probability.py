@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from psychsim.probability import Distribution
+
+
+def test_from_array():
+    dist = Distribution.from_array(['a', 'b', 'c'], np.array([0.5, 0.25, 0.25]))
+    assert dist == Distribution({'a': 0.5, 'b': 0.25, 'c': 0.25})
+    assert dist.is_complete()
+    assert all(isinstance(prob, float) for prob in dist.values())
+    with pytest.raises(ValueError):
+        Distribution.from_array(['a', 'b'], np.ones(3)/3)
+    # Repeated elements are merged rather than duplicated
+    dist = Distribution.from_array(['a', 'b', 'a'], np.array([0.25, 0.5, 0.25]))
+    assert len(dist) == 2
+    assert dist['a'] == 0.5
@@ -0,0 +1,43 @@
+from psychsim.pwl.keys import CONSTANT, makeFuture, stateKey, rewardKey, REWARD
+from psychsim.pwl.vector import KeyedVector
+from psychsim.pwl.state import VectorDistributionSet
+from psychsim.pwl.tree import matrixLookupTree, setToMatrixLookup
+
+TABLE = [[0, -1, -2], [3, 4, 5]]
+
+
+def test_matrix_lookup():
+    tree = setToMatrixLookup('R', 'x', 'y', TABLE)
+    assert tree.depth() == 1
+    for x, row in enumerate(TABLE):
+        for y, value in enumerate(row):
+            matrix = tree[KeyedVector({CONSTANT: 1, 'x': x, 'y': y})]
+            assert matrix[makeFuture('R')][CONSTANT] == value
+
+
+def test_matrix_lookup_state():
+    tree = setToMatrixLookup('R', 'x', 'y', TABLE)
+    state = VectorDistributionSet({'x': 1, 'y': 2, 'R': 0})
+    state *= tree
+    state.rollback()
+    assert state['R'].first() == 5
+
+
+def test_bounds():
+    tree = setToMatrixLookup('R', 'x', 'y', TABLE)
+    assert tree.bounds(makeFuture('R')) == (-2, 5)
+    assert tree.bounds(makeFuture('x')) is None
+
+
+def test_interned_keys():
+    name = ''.join(['Agent', ' 1'])
+    assert rewardKey(name) is stateKey('Agent 1', REWARD)
+    assert rewardKey(name, True) == "Agent 1's __REWARD__'"
+
+
+def test_lookup_leaves():
+    table = [[x > y for y in range(3)] for x in range(2)]
+    tree = matrixLookupTree('x', 'y', table)
+    for x, row in enumerate(table):
+        for y, value in enumerate(row):
+            assert tree[KeyedVector({CONSTANT: 1, 'x': x, 'y': y})] is value
@@ -1,8 +1,11 @@
-from psychsim.pwl.keys import WORLD, CONSTANT, makeFuture
+import pickle
+
+from psychsim.pwl.keys import WORLD, CONSTANT, makeFuture, rewardKey
 from psychsim.pwl.vector import KeyedVector
-from psychsim.pwl.matrix import KeyedMatrix, setTrueMatrix, setFalseMatrix
-from psychsim.pwl.plane import trueRow, KeyedPlane
+from psychsim.pwl.matrix import KeyedMatrix, setTrueMatrix, setFalseMatrix, incrementMatrix, setToConstantMatrix
+from psychsim.pwl.plane import trueRow, thresholdRow, KeyedPlane
 from psychsim.pwl.tree import makeTree
+from psychsim.reward import maximizeFeature, minimizeFeature
 from psychsim.world import World
 
 
@@ -34,3 +37,107 @@ def test_nochange():
     world.setOrder([{a.name}])
 
     world.step()
+
+
+def test_value_cache():
+    world = World()
+    world.set_value_cache()
+    x = world.defineState(WORLD, 'x', int, lo=-5, hi=5)
+    world.setFeature(x, 0)
+    a = world.addAgent('Agent')
+    inc = a.addAction({'verb': 'inc'})
+    dec = a.addAction({'verb': 'dec'})
+    world.setDynamics(x, inc, makeTree(incrementMatrix(x, 1)))
+    world.setDynamics(x, dec, makeTree(incrementMatrix(x, -1)))
+    a.setReward(maximizeFeature(x, a.name), 1)
+    a.setAttribute('horizon', 1)
+    world.setOrder([a.name])
+
+    model = a.get_true_model()
+    first = a.decide(model=model)
+    assert first['action'] == inc
+    assert len(world.value_cache) == 2
+    second = a.decide(model=model)
+    assert second['V'][inc] is first['V'][inc]
+    # Changing the reward invalidates the stored values
+    a.setReward(maximizeFeature(x, a.name), 0)
+    a.setReward(minimizeFeature(x, a.name), 1)
+    assert len(world.value_cache) == 0
+    assert a.decide(model=model)['action'] == dec
+    # Stored values are not pickled
+    assert len(world.value_cache) == 2
+    restored = pickle.loads(pickle.dumps(world))
+    assert len(restored.value_cache) == 0 and restored.value_cache_size == world.value_cache_size
+    # Setting beliefs recursively invalidates the stored values
+    world.setFeature(x, 1, recurse=True)
+    assert len(world.value_cache) == 0
+
+
+def test_value_cache_old_world():
+    world = World()
+    x = world.defineState(WORLD, 'x', int, lo=-5, hi=5)
+    world.setFeature(x, 0)
+    a = world.addAgent('Agent')
+    a.addAction({'verb': 'noop'})
+    world.setOrder([a.name])
+    # A world saved before the value cache existed
+    state = world.__getstate__()
+    del state['value_cache']
+    del state['value_cache_size']
+    restored = World.__new__(World)
+    restored.__setstate__(state)
+    restored.agents[a.name].setAttribute('horizon', 1)
+    restored.step()
+
+
+def test_prune():
+    world = World()
+    x = world.defineState(WORLD, 'x', int, lo=-5, hi=5)
+    world.setFeature(x, 0)
+    a = world.addAgent('Agent')
+    inc = a.addAction({'verb': 'inc'})
+    dec = a.addAction({'verb': 'dec'})
+    world.setDynamics(x, inc, makeTree(incrementMatrix(x, 1)))
+    world.setDynamics(x, dec, makeTree(incrementMatrix(x, -1)))
+    R = rewardKey(a.name)
+    a.setReward(makeTree({'if': thresholdRow(x, 0),
+                          True: setToConstantMatrix(R, 1), False: setToConstantMatrix(R, -1)}), 1)
+    a.setAttribute('horizon', 2)
+    a.setAttribute('selection', 'consistent')
+    a.setAttribute('prune', True)
+    world.setOrder([a.name])
+
+    decision = a.decide(model=a.get_true_model(), actions=[inc, dec])
+    assert decision['action'] == inc
+    assert dec not in decision['V']
+    assert not decision['V'][inc].get('__pruned__', False)
+
+
+def test_mental_model_indices():
+    world = World()
+    a = world.addAgent('A')
+    b = world.addAgent('B')
+    for agent in [a, b]:
+        agent.addAction({'verb': 'noop'})
+    world.setOrder([{a.name, b.name}])
+    models = [b.addModel(name, parent=b.get_true_model())['index'] for name in ['B1', 'B2']]
+    world.setMentalModel(a.name, b.name, (models, [0.25, 0.75]))
+    belief = world.getModel(b.name, a.getBelief(model=a.get_true_model()))
+    assert belief['B1'] == 0.25 and belief['B2'] == 0.75
+    world.setMentalModel(a.name, b.name, ([models[0], models[1], models[0]], [0.25, 0.5, 0.25]))
+    belief = world.getModel(b.name, a.getBelief(model=a.get_true_model()))
+    assert len(belief) == 2 and belief['B1'] == 0.5
+
+
+def test_constant_effect():
+    world = World()
+    p = world.defineState(WORLD, 'p', int, lo=0, hi=5)
+    world.setFeature(p, 0)
+    a = world.addAgent('Agent')
+    action = a.addAction({'verb': 'set'})
+    world.setDynamics(p, action, makeTree(setToConstantMatrix(p, 2)))
+    world.setOrder([{a.name}])
+
+    world.step()
+    assert world.getFeature(p, unique=True) == 2
+    assert makeFuture(p) not in world.state
@@ -1,5 +1,6 @@
 from __future__ import print_function
 import bz2
+from collections import OrderedDict
 import copy
 import json
 import os
@@ -75,6 +76,10 @@ class World(object):
 
         self.history = []
 
+        # Action values computed during previous decisions (off by default)
+        self.value_cache = OrderedDict()
+        self.value_cache_size = 0
+
         self.diagram = None
         self.color = None
         self.extras = {}
@@ -106,6 +111,7 @@ class World(object):
         del self.history[:]
         del self.termination[:]
         self.state.clear()
+        self.value_cache.clear()
 
     def clearCoords(self):
         if self.diagram:
@@ -124,6 +130,23 @@ class World(object):
         :type flag: bool
         """
         self.parallel = flag
+
+    def set_value_cache(self, maxsize=100000):
+        """
+        Turns on the reuse of action values across decisions made from identical beliefs (e.g., over repeated calls to L{step})
+        :param maxsize: the maximum number of values to keep, discarding the least recently used first (0 turns the cache off)
+        :type maxsize: int
+
+        .. warning:: the cache is cleared by changes made through the L{World} and L{Agent} methods (e.g., L{setDynamics}, L{Agent.setAttribute}), but not by direct modification of models or beliefs, in which case call L{clear_value_cache}
+        """
+        self.value_cache_size = maxsize
+        self.value_cache.clear()
+
+    def clear_value_cache(self):
+        """
+        Discards any action values stored by previous decisions
+        """
+        self.value_cache.clear()
         
     """------------------"""
     """Simulation methods"""
@@ -354,33 +377,39 @@ class World(object):
                         tree = cumulative
                     else:
                         tree = dynamics[0]
-                    for in_key in tree.getKeysIn():
-                        if isFuture(in_key) and in_key not in state:
-                            state.copy_value(makePresent(in_key), in_key)
-                    try:
-                        if sample:
-                            if isinstance(state, VectorDistributionSet):
-                                state.multiply_tree(tree, select=sample)
-#                                state.__imul__(tree, select)
-                            else:
-                                if isinstance(tree, KeyedMatrix):
-                                    state *= tree
+                    if isinstance(state, VectorDistributionSet) and isinstance(tree, KeyedTree) and tree.isLeaf() and \
+                            tree.getKeysIn() == {CONSTANT}:
+                        # Effect only writes constants, so there is nothing to compute over the current distribution
+                        for row_key, row in tree.children[None].items():
+                            state.join(row_key, row[CONSTANT])
+                    else:
+                        for in_key in tree.getKeysIn():
+                            if isFuture(in_key) and in_key not in state:
+                                state.copy_value(makePresent(in_key), in_key)
+                        try:
+                            if sample:
+                                if isinstance(state, VectorDistributionSet):
+                                    state.multiply_tree(tree, select=sample)
+#                                    state.__imul__(tree, select)
                                 else:
-                                    raise TypeError(f'Unable to generate selective effect from:\n{tree}')
-                        else:
-                            state *= tree
-                    except StopIteration:
-                        self.printState(state)
-                        print(tree)
-                        raise RuntimeError
-                    except KeyError:
-                        print('Applying effect on %s' % (key))
-                        print('Effect tree is\n%s' % (tree))
-                        raise
-                    except ValueError:
-                        print('Applying effect on %s' % (key))
-                        print('Effect tree is\n%s' % (tree))
-                        raise
+                                    if isinstance(tree, KeyedMatrix):
+                                        state *= tree
+                                    else:
+                                        raise TypeError(f'Unable to generate selective effect from:\n{tree}')
+                            else:
+                                state *= tree
+                        except StopIteration:
+                            self.printState(state)
+                            print(tree)
+                            raise RuntimeError
+                        except KeyError:
+                            print('Applying effect on %s' % (key))
+                            print('Effect tree is\n%s' % (tree))
+                            raise
+                        except ValueError:
+                            print('Applying effect on %s' % (key))
+                            print('Effect tree is\n%s' % (tree))
+                            raise
                 if isinstance(select, dict) and key in select:
                     try:
                         target = makeFuture(key)
@@ -581,6 +610,7 @@ class World(object):
             tree.ceil(key,self.variables[key]['hi'])
         self.dynamics[key][action] = tree
         self.dynamics[action][key] = tree
+        self.clear_value_cache()
 #        if action is not True and len(action) == 1:
 #            self.dynamics[next(iter(action))][key] = tree
         if codePtr:
@@ -764,6 +794,7 @@ class World(object):
         :type order: str[] or {str}[]
         """
         self.maxTurn = len(order) - 1
+        self.clear_value_cache()
         for index in range(len(order)):
             if isinstance(order[index], set):
                 names = order[index]
@@ -1097,6 +1128,8 @@ class World(object):
                             self.setFeature(key, value, beliefs, noclobber)
                 if inconsistent:
                     state.delete_value(modelKey(name), set(inconsistent))
+            # Other agents' beliefs have changed in place
+            self.clear_value_cache()
 
     def setJoint(self,distribution,state=None):
         """
@@ -1399,6 +1432,11 @@ class World(object):
             state = self.state
         if isinstance(distribution, dict):
             distribution = psychsim.probability.Distribution(distribution)
+        elif isinstance(distribution, tuple):
+            # Paired arrays of model indices and probabilities (summed over any repeated index)
+            indices, probabilities = distribution
+            models = [self.agents[modelee].index2model(index, True) for index in indices]
+            distribution = psychsim.probability.Distribution.from_array(models, probabilities)
         key = modelKey(modelee)
         if isinstance(state, str):
             # This is the name of the modeling agent (*cough* hack *cough*)
@@ -1411,6 +1449,8 @@ class World(object):
         """
         Sets the distribution over mental models one agent has of another entity
         @note: Normalizes the distribution given
+        :param distribution: the distribution over model names, or else a pair of arrays of model indices (as assigned by L{Agent.addModel}) and their probabilities
+        :type distribution: L{Distribution} or (int[],float[])
         """
         self.setModel(modelee,distribution,modeler,model)
 
@@ -1921,6 +1961,18 @@ class World(object):
     """Serialization methods"""
     """---------------------"""
         
+    def __getstate__(self):
+        # Stored action values can always be recomputed, so leave them out of saved worlds (and multiprocessing arguments)
+        state = dict(self.__dict__)
+        state['value_cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Worlds saved before the value cache existed
+        self.__dict__.setdefault('value_cache', OrderedDict())
+        self.__dict__.setdefault('value_cache_size', 0)
+
     def save(self, filename):
         """
         :returns: the filename used (possibly with a .psy extension added)